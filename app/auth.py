@@ -1,12 +1,17 @@
 """API Key authentication dependency."""
 
-from fastapi import HTTPException, Security, status
+import hmac
+
+from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import APIKeyHeader
 
 from app.config import get_settings
 
 settings = get_settings()
 
+# Encoded once so each request only pays for a single constant-time compare
+_API_KEY_BYTES = settings.api_key.encode("utf-8")
+
 api_key_header = APIKeyHeader(name="X-API-Key", auto_error=False)
 
 
@@ -29,10 +34,14 @@ async def verify_api_key(api_key: str = Security(api_key_header)) -> str:
             detail="Missing API key. Provide X-API-Key header."
         )
 
-    if api_key != settings.api_key:
+    if not hmac.compare_digest(api_key.encode("utf-8"), _API_KEY_BYTES):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key"
         )
 
     return api_key
+
+
+# Shared dependency marker so every protected route reuses the same instance
+RequireAPIKey = Depends(verify_api_key)
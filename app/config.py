@@ -2,6 +2,7 @@
 
 from pathlib import Path
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -18,6 +19,25 @@ class Settings(BaseSettings):
     # Video constraints
     max_video_duration: int = 60  # seconds
 
+    # Maximum concurrent video downloads
+    max_parallel_downloads: int = 4
+
+    # Maximum concurrent ffprobe processes
+    probe_workers: int = 4
+
+    # Video encoder (libx264 is always the fallback)
+    encoder: Literal["auto", "vaapi", "nvenc", "libx264"] = "auto"
+
+    # libx264 tuning (CPU encoding): throughput over compression efficiency
+    x264_preset: Literal[
+        "ultrafast", "superfast", "veryfast", "faster", "fast",
+        "medium", "slow", "slower", "veryslow", "placebo"
+    ] = "veryfast"
+    x264_tune: Literal[
+        "film", "animation", "grain", "stillimage",
+        "fastdecode", "zerolatency", "psnr", "ssim"
+    ] = "zerolatency"
+
     # Logging
     log_level: str = "INFO"
 
@@ -1,14 +1,19 @@
 """FastAPI application entry point."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from starlette.routing import Route
 
 from app.config import get_settings
 from app.routers import align, render
+from app.services.ffmpeg import get_available_encoders
+from app.services.video import close_client
+from app.tempfiles import ensure_temp_dir
 
 settings = get_settings()
 
@@ -24,13 +29,17 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan handler for startup/shutdown."""
     # Startup: ensure temp directory exists
-    temp_dir = Path(settings.temp_dir)
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    temp_dir = ensure_temp_dir()
     logger.info(f"Temp directory ready: {temp_dir}")
 
+    # Probe FFmpeg encoders once so renders can pick hardware backends
+    encoders = await asyncio.to_thread(get_available_encoders)
+    logger.info(f"FFmpeg encoders detected: {len(encoders)}")
+
     yield
 
-    # Shutdown: cleanup could go here
+    # Shutdown: release pooled download connections
+    await close_client()
     logger.info("Application shutting down")
 
 
@@ -38,6 +47,7 @@ app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="API for forced alignment and subtitle rendering",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -55,24 +65,33 @@ app.include_router(align.router, tags=["Alignment"])
 app.include_router(render.router, tags=["Rendering"])
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint."""
-    return {
-        "status": "ok",
-        "version": settings.app_version
+# Static info endpoints are mounted as plain Starlette routes with
+# prebuilt responses, bypassing FastAPI's dependency/serialization pipeline
+_HEALTH_RESPONSE = ORJSONResponse({
+    "status": "ok",
+    "version": settings.app_version
+})
+
+_ROOT_RESPONSE = ORJSONResponse({
+    "name": settings.app_name,
+    "version": settings.app_version,
+    "endpoints": {
+        "align": "/align - POST - Forced alignment of script to audio",
+        "render": "/render - POST - Render video with subtitles",
+        "health": "/health - GET - Health check"
     }
+})
+
+
+async def health_check(request: Request) -> ORJSONResponse:
+    """Health check endpoint."""
+    return _HEALTH_RESPONSE
 
 
-@app.get("/")
-async def root():
+async def root(request: Request) -> ORJSONResponse:
     """Root endpoint with API info."""
-    return {
-        "name": settings.app_name,
-        "version": settings.app_version,
-        "endpoints": {
-            "align": "/align - POST - Forced alignment of script to audio",
-            "render": "/render - POST - Render video with subtitles",
-            "health": "/health - GET - Health check"
-        }
-    }
+    return _ROOT_RESPONSE
+
+
+app.router.routes.append(Route("/health", health_check, methods=["GET"]))
+app.router.routes.append(Route("/", root, methods=["GET"]))
@@ -1,12 +1,14 @@
 """Pydantic models for request/response schemas."""
 
 from typing import List, Optional
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 
 
 class Segment(BaseModel):
     """A single subtitle segment with timing."""
 
+    model_config = ConfigDict(frozen=True)
+
     start: float = Field(..., ge=0, description="Start time in seconds")
     end: float = Field(..., ge=0, description="End time in seconds")
     text: str = Field(..., min_length=1, description="Subtitle text")
@@ -1,10 +1,12 @@
 """Alignment endpoint router."""
 
+import asyncio
 import logging
+from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, HTTPException, status
 
-from app.auth import verify_api_key
+from app.auth import RequireAPIKey
 from app.config import get_settings
 from app.models.schemas import AlignRequest, AlignResponse
 from app.services.video import (
@@ -17,6 +19,7 @@ from app.services.video import (
 from app.services.alignment import forced_align, AlignmentError
 
 settings = get_settings()
+MAX_VIDEO_DURATION = settings.max_video_duration
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -35,14 +38,14 @@ router = APIRouter()
 )
 async def align_endpoint(
     request: AlignRequest,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = RequireAPIKey
 ):
     """
     Perform forced alignment of script text to video audio.
 
     This endpoint:
     1. Downloads the video from the provided URL
-    2. Extracts the audio track
+    2. Probes the duration while the audio track is extracted
     3. Performs forced alignment using Aeneas
     4. Returns timed subtitle segments
 
@@ -56,16 +59,27 @@ async def align_endpoint(
         logger.info(f"Processing align request for {request.video_url}")
         video_path = await download_video(str(request.video_url))
 
-        # Check video duration
-        duration = get_video_duration(video_path)
-        if duration > settings.max_video_duration:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Video too long ({duration:.1f}s). Maximum is {settings.max_video_duration}s."
-            )
-
-        # Extract audio
-        audio_path = await extract_audio(video_path)
+        # Extract audio in the background while the duration is probed.
+        # An over-long video is rejected as soon as the probe returns, and
+        # the extraction is cancelled (killing FFmpeg) before `finally` runs.
+        audio_task = asyncio.create_task(extract_audio(video_path))
+        try:
+            duration = await get_video_duration(video_path)
+
+            # Check video duration
+            if duration > MAX_VIDEO_DURATION:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Video too long ({duration:.1f}s). Maximum is {MAX_VIDEO_DURATION}s."
+                )
+        except BaseException:
+            audio_task.cancel()
+            (audio_result,) = await asyncio.gather(audio_task, return_exceptions=True)
+            if isinstance(audio_result, Path):
+                audio_path = audio_result
+            raise
+
+        audio_path = await audio_task
 
         # Perform alignment
         segments = await forced_align(
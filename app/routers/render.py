@@ -1,13 +1,15 @@
 """Render endpoint router."""
 
+import asyncio
 import logging
+import os
 from pathlib import Path
 from typing import List
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, HTTPException, status
 from fastapi.responses import FileResponse
 
-from app.auth import verify_api_key
+from app.auth import RequireAPIKey
 from app.config import get_settings
 from app.models.schemas import RenderRequest
 from app.services.video import (
@@ -17,11 +19,12 @@ from app.services.video import (
     cleanup_files,
     VideoError
 )
-from app.services.ass_generator import save_ass_file
+from app.services.ass_generator import generate_ass
 from app.services.ffmpeg import render_subtitles, RenderError
 from app.templates.styles import AVAILABLE_PRESETS
 
 settings = get_settings()
+MAX_VIDEO_DURATION = settings.max_video_duration
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
@@ -46,21 +49,20 @@ def cleanup_task(paths: List[Path]):
 async def render_endpoint(
     request: RenderRequest,
     background_tasks: BackgroundTasks,
-    api_key: str = Depends(verify_api_key)
+    api_key: str = RequireAPIKey
 ):
     """
     Render video with hardcoded subtitles.
 
     This endpoint:
     1. Downloads the video from the provided URL
-    2. Generates ASS subtitle file from segments
+    2. Generates ASS subtitles from segments
     3. Burns subtitles into video using FFmpeg
     4. Returns the rendered video file
 
     Use the output from /align as the segments input.
     """
     video_path = None
-    ass_path = None
     output_path = None
 
     try:
@@ -75,61 +77,61 @@ async def render_endpoint(
         video_path = await download_video(str(request.video_url))
 
         # Check video duration
-        duration = get_video_duration(video_path)
-        if duration > settings.max_video_duration:
+        duration = await get_video_duration(video_path)
+        if duration > MAX_VIDEO_DURATION:
             raise HTTPException(
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"Video too long ({duration:.1f}s). Maximum is {settings.max_video_duration}s."
+                detail=f"Video too long ({duration:.1f}s). Maximum is {MAX_VIDEO_DURATION}s."
             )
 
         # Get video resolution for style scaling
-        resolution = get_video_resolution(video_path)
+        resolution = await get_video_resolution(video_path)
 
-        # Generate ASS file
-        ass_path = video_path.with_suffix(".ass")
-        save_ass_file(
+        # Generate ASS content; it is handed to FFmpeg without a temp file
+        ass_content = generate_ass(
             segments=request.segments,
             style_preset=request.style_preset,
-            resolution=resolution,
-            output_path=ass_path
-        )
+            resolution=resolution
+        ).encode("utf-8")
 
         # Render video with subtitles
-        output_path = await render_subtitles(video_path, ass_path)
+        output_path = await render_subtitles(video_path, ass_content)
 
         logger.info(f"Render complete: {output_path}")
 
         # Schedule cleanup after response is sent
-        paths_to_cleanup = [p for p in [video_path, ass_path, output_path] if p]
+        paths_to_cleanup = [p for p in [video_path, output_path] if p]
         background_tasks.add_task(cleanup_task, paths_to_cleanup)
 
-        # Return video file
+        # Return video file; stat up front so headers are ready on send
+        output_stat = await asyncio.to_thread(os.stat, output_path)
         return FileResponse(
             path=str(output_path),
+            stat_result=output_stat,
             media_type="video/mp4",
             filename="subtitled_video.mp4"
         )
 
     except VideoError as e:
         logger.error(f"Video processing error: {e}")
-        cleanup_files(video_path, ass_path, output_path)
+        cleanup_files(video_path, output_path)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except RenderError as e:
         logger.error(f"Render error: {e}")
-        cleanup_files(video_path, ass_path, output_path)
+        cleanup_files(video_path, output_path)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except HTTPException:
-        cleanup_files(video_path, ass_path, output_path)
+        cleanup_files(video_path, output_path)
         raise
     except Exception as e:
         logger.exception(f"Unexpected error in render endpoint: {e}")
-        cleanup_files(video_path, ass_path, output_path)
+        cleanup_files(video_path, output_path)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An unexpected error occurred during rendering"
@@ -141,7 +143,7 @@ async def render_endpoint(
     summary="List available style presets",
     description="Returns a list of available subtitle style presets."
 )
-async def list_styles(api_key: str = Depends(verify_api_key)):
+async def list_styles(api_key: str = RequireAPIKey):
     """Get list of available subtitle style presets."""
     return {
         "presets": AVAILABLE_PRESETS,
@@ -1,33 +1,43 @@
 """Forced alignment service using Aeneas."""
 
-import json
+import itertools
 import logging
+import os
 import re
 import tempfile
-import uuid
+import wave
 from pathlib import Path
-from typing import List
+from typing import List, NamedTuple
+
+import orjson
 
-from app.config import get_settings
 from app.models.schemas import Segment
+from app.tempfiles import ensure_temp_dir, tmp_name
 
-settings = get_settings()
 logger = logging.getLogger(__name__)
 
-# Language code mapping for Aeneas
-LANGUAGE_MAP = {
-    "vie": "vie",  # Vietnamese
-    "deu": "deu",  # German
-    "eng": "eng",  # English
-    "fra": "fra",  # French
-    "spa": "spa",  # Spanish
-    "ita": "ita",  # Italian
-    "por": "por",  # Portuguese
-    "rus": "rus",  # Russian
-    "zho": "zho",  # Chinese
-    "jpn": "jpn",  # Japanese
-    "kor": "kor",  # Korean
-}
+# Language codes supported by Aeneas
+SUPPORTED_LANGUAGES = frozenset({
+    "vie",  # Vietnamese
+    "deu",  # German
+    "eng",  # English
+    "fra",  # French
+    "spa",  # Spanish
+    "ita",  # Italian
+    "por",  # Portuguese
+    "rus",  # Russian
+    "zho",  # Chinese
+    "jpn",  # Japanese
+    "kor",  # Korean
+})
+
+
+class _SegmentRaw(NamedTuple):
+    """Lightweight segment used internally; converted to Segment once."""
+
+    start: float
+    end: float
+    text: str
 
 
 class AlignmentError(Exception):
@@ -62,10 +72,10 @@ def _split_into_sentences(text: str, max_words: int = 5) -> List[str]:
 
 
 def _normalize_segments(
-    segments: List[Segment],
+    segments: List[_SegmentRaw],
     max_chars: int = 80,
     max_lines: int = 2
-) -> List[Segment]:
+) -> List[_SegmentRaw]:
     """
     Normalize segments for subtitle display.
 
@@ -89,15 +99,20 @@ def _normalize_segments(
             words = text.split()
             lines = []
             current_line = []
+            current_len = 0
+            line_limit = max_chars // max_lines
 
             for word in words:
-                test_line = " ".join(current_line + [word])
-                if len(test_line) <= max_chars // max_lines:
+                # Track the joined length instead of re-joining per word
+                added_len = len(word) + (1 if current_line else 0)
+                if current_len + added_len <= line_limit:
                     current_line.append(word)
+                    current_len += added_len
                 else:
                     if current_line:
                         lines.append(" ".join(current_line))
                     current_line = [word]
+                    current_len = len(word)
 
             if current_line:
                 lines.append(" ".join(current_line))
@@ -105,11 +120,10 @@ def _normalize_segments(
             # Limit to max_lines
             text = "\n".join(lines[:max_lines])
 
-        normalized.append(Segment(
-            start=segment.start,
-            end=segment.end,
-            text=text
-        ))
+        # Only allocate a new segment when the text actually changed
+        if text != segment.text:
+            segment = _SegmentRaw(segment.start, segment.end, text)
+        normalized.append(segment)
 
     return normalized
 
@@ -134,12 +148,10 @@ async def forced_align(
         AlignmentError: If alignment fails
     """
     # Validate language
-    if language not in LANGUAGE_MAP:
+    if language not in SUPPORTED_LANGUAGES:
         logger.warning(f"Unknown language '{language}', defaulting to 'eng'")
         language = "eng"
 
-    aeneas_lang = LANGUAGE_MAP[language]
-
     # Split text into sentences
     sentences = _split_into_sentences(script_text)
     if not sentences:
@@ -148,17 +160,15 @@ async def forced_align(
     logger.info(f"Aligning {len(sentences)} sentences in {language}")
 
     # Create temp files for Aeneas
-    temp_dir = Path(settings.temp_dir)
-    job_id = str(uuid.uuid4())[:8]
+    job_id = tmp_name("")
 
+    temp_dir = ensure_temp_dir()
     text_file = temp_dir / f"{job_id}_text.txt"
     output_file = temp_dir / f"{job_id}_output.json"
 
     try:
         # Write sentences to text file (one per line)
-        with open(text_file, "w", encoding="utf-8") as f:
-            for sentence in sentences:
-                f.write(sentence + "\n")
+        text_file.write_bytes(("\n".join(sentences) + "\n").encode("utf-8"))
 
         # Try Aeneas alignment
         try:
@@ -166,7 +176,7 @@ async def forced_align(
                 audio_path,
                 text_file,
                 output_file,
-                aeneas_lang
+                language
             )
         except Exception as e:
             logger.warning(f"Aeneas failed: {e}, using fallback alignment")
@@ -176,16 +186,20 @@ async def forced_align(
         segments = _normalize_segments(segments)
 
         logger.info(f"Alignment complete: {len(segments)} segments")
-        return segments
+        return [
+            Segment(start=segment.start, end=segment.end, text=segment.text)
+            for segment in segments
+        ]
 
     finally:
         # Cleanup temp files
-        for f in [text_file, output_file]:
+        for f in (text_file, output_file):
             try:
-                if f.exists():
-                    f.unlink()
-            except Exception:
+                os.unlink(f)
+            except FileNotFoundError:
                 pass
+            except OSError as e:
+                logger.warning(f"Failed to cleanup {f}: {e}")
 
 
 async def _run_aeneas(
@@ -193,7 +207,7 @@ async def _run_aeneas(
     text_file: Path,
     output_file: Path,
     language: str
-) -> List[Segment]:
+) -> List[_SegmentRaw]:
     """
     Run Aeneas forced alignment.
 
@@ -235,8 +249,7 @@ async def _run_aeneas(
             raise AlignmentError(f"Aeneas failed: {error_msg}")
 
         # Parse output
-        with open(output_file, "r", encoding="utf-8") as f:
-            result = json.load(f)
+        result = orjson.loads(output_file.read_bytes())
 
         segments = []
         for fragment in result.get("fragments", []):
@@ -245,24 +258,24 @@ async def _run_aeneas(
             if not text:
                 continue
 
-            segments.append(Segment(
-                start=float(fragment.get("begin", 0)),
-                end=float(fragment.get("end", 0)),
-                text=text
+            segments.append(_SegmentRaw(
+                float(fragment.get("begin", 0)),
+                float(fragment.get("end", 0)),
+                text
             ))
 
         return segments
 
     except FileNotFoundError:
         raise AlignmentError("Aeneas not installed. Run: pip install aeneas")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise AlignmentError("Failed to parse Aeneas output")
 
 
 def _fallback_alignment(
     sentences: List[str],
     audio_path: Path
-) -> List[Segment]:
+) -> List[_SegmentRaw]:
     """
     Fallback alignment when Aeneas is not available.
     Distributes sentences evenly across audio duration.
@@ -274,21 +287,10 @@ def _fallback_alignment(
     Returns:
         List of segments with estimated timing
     """
-    from app.services.video import get_video_duration
-
-    # Get audio duration
+    # Get audio duration from the WAV header (extract_audio writes PCM WAV)
     try:
-        # Use ffprobe on audio file
-        import subprocess
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(audio_path)
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-        duration = float(result.stdout.strip())
+        with wave.open(str(audio_path), "rb") as wav:
+            duration = wav.getnframes() / wav.getframerate()
     except Exception:
         # Default fallback
         duration = len(sentences) * 3.0  # ~3 seconds per sentence
@@ -296,26 +298,16 @@ def _fallback_alignment(
     logger.warning(f"Using fallback alignment for {len(sentences)} sentences over {duration}s")
 
     # Calculate timing based on text length
-    total_chars = sum(len(s) for s in sentences)
-    if total_chars == 0:
-        total_chars = 1
-
-    segments = []
-    current_time = 0.0
-
-    for sentence in sentences:
-        # Duration proportional to text length
-        sentence_duration = (len(sentence) / total_chars) * duration
-
-        # Minimum duration
-        sentence_duration = max(sentence_duration, 0.5)
-
-        segments.append(Segment(
-            start=round(current_time, 3),
-            end=round(current_time + sentence_duration, 3),
-            text=sentence
-        ))
-
-        current_time += sentence_duration
-
-    return segments
+    lengths = [len(s) for s in sentences]
+    total_chars = sum(lengths) or 1
+    scale = duration / total_chars
+
+    # Duration proportional to text length, with a minimum duration;
+    # running sums give every segment's end time in one pass
+    ends = list(itertools.accumulate(max(n * scale, 0.5) for n in lengths))
+    starts = [0.0] + ends[:-1]
+
+    return [
+        _SegmentRaw(round(start, 3), round(end, 3), sentence)
+        for start, end, sentence in zip(starts, ends, sentences)
+    ]
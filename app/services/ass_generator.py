@@ -1,14 +1,39 @@
 """ASS subtitle file generator."""
 
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
 
 from app.models.schemas import Segment
 from app.templates.styles import get_style_for_resolution, AVAILABLE_PRESETS
 
 logger = logging.getLogger(__name__)
 
+# Replace newlines with ASS line break and drop carriage returns
+_ASS_TRANS = str.maketrans({"\n": "\\N", "\r": ""})
+
+# Static ASS header: Script Info, V4+ Styles and Events format sections
+_ASS_HEADER_TEMPLATE = (
+    "[Script Info]\n"
+    "Title: Generated Subtitles\n"
+    "ScriptType: v4.00+\n"
+    "PlayResX: {width}\n"
+    "PlayResY: {height}\n"
+    "ScaledBorderAndShadow: yes\n"
+    "YCbCr Matrix: TV.709\n"
+    "\n"
+    "[V4+ Styles]\n"
+    "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
+    "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
+    "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
+    "Alignment, MarginL, MarginR, MarginV, Encoding\n"
+    "{style_line}\n"
+    "\n"
+    "[Events]\n"
+    "Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text"
+)
+
 
 def _seconds_to_ass_time(seconds: float) -> str:
     """
@@ -20,10 +45,12 @@ def _seconds_to_ass_time(seconds: float) -> str:
     Returns:
         ASS formatted timestamp
     """
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
-    centiseconds = int((seconds % 1) * 100)
+    # Work in integer centiseconds; rounding avoids float artifacts
+    # such as 1.99 * 100 == 198.99999999999997
+    total_cs = round(seconds * 100)
+    hours, remainder = divmod(total_cs, 360000)
+    minutes, remainder = divmod(remainder, 6000)
+    secs, centiseconds = divmod(remainder, 100)
 
     return f"{hours}:{minutes:02d}:{secs:02d}.{centiseconds:02d}"
 
@@ -38,31 +65,52 @@ def _escape_ass_text(text: str) -> str:
     Returns:
         Escaped text safe for ASS
     """
-    # Replace newlines with ASS line break
-    text = text.replace("\n", "\\N")
-
-    # Escape special ASS characters
     # Note: { } are used for override tags, but we don't escape them
     # as they might be intentionally used
+    return text.translate(_ASS_TRANS)
+
 
-    return text
+@lru_cache(maxsize=64)
+def _ass_header(style_preset: str, width: int, height: int) -> str:
+    """
+    Build the static ASS header for a preset and resolution.
 
+    Args:
+        style_preset: Name of a known style preset
+        width: Video width
+        height: Video height
 
-def generate_ass(
+    Returns:
+        Formatted header, without trailing newline
+    """
+    # Get style adjusted for resolution
+    style = get_style_for_resolution(style_preset, width, height)
+
+    return _ASS_HEADER_TEMPLATE.format(
+        width=width,
+        height=height,
+        style_line=style.to_ass_line()
+    )
+
+
+def iter_ass_lines(
     segments: List[Segment],
     style_preset: str,
     resolution: Tuple[int, int]
-) -> str:
+) -> Iterator[str]:
     """
-    Generate ASS subtitle file content.
+    Generate ASS subtitle file content line by line.
+
+    The static header is yielded as a single block, followed by one
+    Dialogue line per segment. Lines carry no trailing newline.
 
     Args:
         segments: List of subtitle segments with timing
         style_preset: Name of the style preset to use
         resolution: Video resolution as (width, height)
 
-    Returns:
-        Complete ASS file content as string
+    Yields:
+        ASS file content, header first, then dialogue lines
     """
     width, height = resolution
 
@@ -71,49 +119,35 @@ def generate_ass(
         logger.warning(f"Unknown preset '{style_preset}', using 'tiktok_clean'")
         style_preset = "tiktok_clean"
 
-    # Get style adjusted for resolution
-    style = get_style_for_resolution(style_preset, width, height)
-
     logger.info(f"Generating ASS with style '{style_preset}' for {width}x{height}")
 
-    # Build ASS file
-    ass_content = []
-
-    # Script Info section
-    ass_content.append("[Script Info]")
-    ass_content.append("Title: Generated Subtitles")
-    ass_content.append("ScriptType: v4.00+")
-    ass_content.append(f"PlayResX: {width}")
-    ass_content.append(f"PlayResY: {height}")
-    ass_content.append("ScaledBorderAndShadow: yes")
-    ass_content.append("YCbCr Matrix: TV.709")
-    ass_content.append("")
-
-    # Styles section
-    ass_content.append("[V4+ Styles]")
-    ass_content.append(
-        "Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, "
-        "OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, "
-        "ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, "
-        "Alignment, MarginL, MarginR, MarginV, Encoding"
-    )
-    ass_content.append(style.to_ass_line())
-    ass_content.append("")
-
-    # Events section
-    ass_content.append("[Events]")
-    ass_content.append("Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text")
+    yield _ass_header(style_preset, width, height)
 
     for segment in segments:
-        start_time = _seconds_to_ass_time(segment.start)
-        end_time = _seconds_to_ass_time(segment.end)
-        text = _escape_ass_text(segment.text)
+        yield (
+            f"Dialogue: 0,{_seconds_to_ass_time(segment.start)},"
+            f"{_seconds_to_ass_time(segment.end)},Default,,0,0,0,,"
+            f"{_escape_ass_text(segment.text)}"
+        )
+
+
+def generate_ass(
+    segments: List[Segment],
+    style_preset: str,
+    resolution: Tuple[int, int]
+) -> str:
+    """
+    Generate ASS subtitle file content.
 
-        # Dialogue line format
-        dialogue = f"Dialogue: 0,{start_time},{end_time},Default,,0,0,0,,{text}"
-        ass_content.append(dialogue)
+    Args:
+        segments: List of subtitle segments with timing
+        style_preset: Name of the style preset to use
+        resolution: Video resolution as (width, height)
 
-    return "\n".join(ass_content)
+    Returns:
+        Complete ASS file content as string
+    """
+    return "\n".join(iter_ass_lines(segments, style_preset, resolution))
 
 
 def save_ass_file(
@@ -134,10 +168,11 @@ def save_ass_file(
     Returns:
         Path to the saved file
     """
-    content = generate_ass(segments, style_preset, resolution)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(content)
+    # Stream lines to disk instead of materializing the whole file in memory
+    with open(output_path, "w", encoding="utf-8", buffering=1 << 16) as f:
+        for line in iter_ass_lines(segments, style_preset, resolution):
+            f.write(line)
+            f.write("\n")
 
     logger.info(f"ASS file saved to {output_path}")
     return output_path
@@ -2,23 +2,320 @@
 
 import asyncio
 import logging
-import uuid
+import os
+import subprocess
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
 from pathlib import Path
+from typing import FrozenSet, Iterator, List, Optional, Tuple
 
 from app.config import get_settings
+from app.services.video import probe_video, VideoError
+from app.tempfiles import ensure_temp_dir, tmp_name
 
-settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+# Cached result of check_ffmpeg_available()
+_ffmpeg_available: Optional[bool] = None
+
+# Device node present when an NVIDIA driver is loaded
+NVIDIA_DEVICE = Path("/dev/nvidiactl")
+
+# DRM render node used for VAAPI (Intel QuickSync, AMD)
+VAAPI_DEVICE = Path("/dev/dri/renderD128")
+
+# Hardware backends in fallback order: FFmpeg encoder name and device node
+_HW_BACKENDS = {
+    "vaapi": ("h264_vaapi", VAAPI_DEVICE),
+    "nvenc": ("h264_nvenc", NVIDIA_DEVICE),
+}
+
+
 class RenderError(Exception):
     """Custom exception for rendering errors."""
     pass
 
 
+@lru_cache(maxsize=1)
+def get_available_encoders() -> FrozenSet[str]:
+    """
+    Get the set of encoders compiled into the local FFmpeg build.
+
+    Runs `ffmpeg -encoders` once per process; the result is cached.
+
+    Returns:
+        Encoder names (e.g. "libx264", "h264_nvenc")
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (FileNotFoundError, subprocess.CalledProcessError):
+        return frozenset()
+
+    # Encoder lines look like " V....D libx264    libx264 H.264 ..."
+    # and follow a "------" separator line
+    encoders = set()
+    in_list = False
+    for line in result.stdout.splitlines():
+        if not in_list:
+            in_list = line.strip().startswith("---")
+            continue
+        parts = line.split()
+        if len(parts) >= 2:
+            encoders.add(parts[1])
+
+    return frozenset(encoders)
+
+
+def _encoder_chain() -> List[str]:
+    """
+    Get the encoders to try, in order, based on the `encoder` setting.
+
+    An explicitly configured hardware backend is tried first, followed by
+    any other detected hardware backend (vaapi, then nvenc). libx264 is
+    always the final fallback.
+
+    Returns:
+        Encoder backend names ("vaapi", "nvenc", "libx264")
+    """
+    choice = get_settings().encoder
+    if choice == "libx264":
+        return ["libx264"]
+
+    available = get_available_encoders()
+    detected = [
+        name for name, (ffmpeg_encoder, device) in _HW_BACKENDS.items()
+        if ffmpeg_encoder in available and device.exists()
+    ]
+
+    if choice in _HW_BACKENDS:
+        chain = [choice] + [name for name in detected if name != choice]
+    else:
+        chain = detected
+
+    return chain + ["libx264"]
+
+
+@contextmanager
+def _ass_input(ass_content: bytes) -> Iterator[Tuple[str, Tuple[int, ...]]]:
+    """
+    Expose ASS content to FFmpeg as a readable path.
+
+    libass needs a seekable file, so a plain stdin pipe does not work.
+    On Linux the content lives in an anonymous memory file that the
+    child process opens as /dev/fd/N; elsewhere a temp file is used.
+
+    Args:
+        ass_content: Encoded ASS subtitle file content
+
+    Yields:
+        Tuple of (path for the ass filter, file descriptors to pass on)
+    """
+    if hasattr(os, "memfd_create"):
+        fd = os.memfd_create("subtitles.ass")
+        try:
+            with open(fd, "wb", closefd=False) as f:
+                f.write(ass_content)
+            yield f"/dev/fd/{fd}", (fd,)
+        finally:
+            os.close(fd)
+        return
+
+    temp_dir = ensure_temp_dir()
+    ass_path = temp_dir / tmp_name("_subtitles.ass")
+    ass_path.write_bytes(ass_content)
+    try:
+        yield str(ass_path), ()
+    finally:
+        ass_path.unlink(missing_ok=True)
+
+
+def _encoder_args(
+    encoder: str,
+    ass_path: str
+) -> Tuple[List[str], List[str], str, List[str]]:
+    """
+    Get the encoder-specific parts of a subtitle render command.
+
+    Global arguments apply to the whole FFmpeg process and must appear
+    once; input arguments apply to the `-i` that follows them.
+
+    Args:
+        encoder: Encoder backend ("vaapi", "nvenc" or "libx264")
+        ass_path: Path FFmpeg reads the ASS subtitles from
+
+    Returns:
+        Tuple of (global arguments, input arguments, video filter,
+        video codec arguments)
+    """
+    if encoder == "nvenc":
+        # Decode and encode on the GPU; the ass filter is CPU-only, so frames
+        # are downloaded for the overlay and uploaded again for NVENC
+        global_args = []
+        input_args = ["-hwaccel", "cuda", "-hwaccel_output_format", "cuda"]
+        video_filter = f"hwdownload,format=nv12,ass={ass_path},hwupload_cuda"
+        video_args = [
+            "-c:v", "h264_nvenc",
+            "-preset", "p4",
+            "-tune", "hq",
+            "-rc", "vbr",
+            "-cq", "23",
+            "-b:v", "0"
+        ]
+    elif encoder == "vaapi":
+        # The ass filter runs on CPU frames, so upload to the VAAPI
+        # surface only after the overlay is drawn
+        global_args = ["-vaapi_device", os.fspath(VAAPI_DEVICE)]
+        input_args = []
+        video_filter = f"ass={ass_path},format=nv12|vaapi,hwupload"
+        video_args = [
+            "-c:v", "h264_vaapi",
+            "-rc_mode", "CQP",
+            "-qp", "23"
+        ]
+    else:
+        settings = get_settings()
+        global_args = []
+        input_args = []
+        video_filter = f"ass={ass_path}"
+        video_args = [
+            "-c:v", "libx264",  # H.264 video codec
+            "-preset", settings.x264_preset,  # Encoding speed preset
+            "-tune", settings.x264_tune,
+            "-crf", "23",  # Quality (lower = better, 18-28 is good range)
+            "-threads", str(os.cpu_count() or 0),  # 0 lets FFmpeg decide
+            # Skip adaptive quantization and lookahead analysis
+            "-x264-params", "aq-mode=0:rc-lookahead=0"
+        ]
+
+    return global_args, input_args, video_filter, video_args
+
+
+def _build_render_cmd(
+    encoder: str,
+    video_path: Path,
+    ass_path: str,
+    output_path: Path,
+    audio_args: List[str],
+    audio_output_path: Optional[Path] = None
+) -> List[str]:
+    """
+    Build the FFmpeg command for burning subtitles with a given encoder.
+
+    Args:
+        encoder: Encoder backend ("vaapi", "nvenc" or "libx264")
+        video_path: Path to input video
+        ass_path: Path FFmpeg reads the ASS subtitles from
+        output_path: Path for the rendered video
+        audio_args: Audio codec arguments
+        audio_output_path: Optional path for a WAV 16kHz mono audio track
+            extracted from the same decode as the render
+
+    Returns:
+        FFmpeg command as argument list
+    """
+    global_args, input_args, video_filter, video_args = _encoder_args(
+        encoder, ass_path
+    )
+
+    if audio_output_path is not None:
+        # First output: audio only, same format as extract_audio();
+        # the rendered video then maps its streams explicitly
+        extra_output_args = [
+            "-map", "0:a:0",
+            "-vn",  # No video
+            "-acodec", "pcm_s16le",  # PCM 16-bit
+            "-ar", "16000",  # 16kHz sample rate
+            "-ac", "1",  # Mono
+            os.fspath(audio_output_path),
+            "-map", "0:v:0",
+            "-map", "0:a?"
+        ]
+    else:
+        extra_output_args = []
+
+    return [
+        "ffmpeg",
+        "-y",  # Overwrite output
+        "-loglevel", "error",  # Only errors reach stderr
+        *global_args,
+        *input_args,
+        "-i", os.fspath(video_path),
+        *extra_output_args,
+        "-vf", video_filter,
+        *video_args,
+        *audio_args,
+        "-movflags", "+faststart",  # Web optimization
+        os.fspath(output_path)
+    ]
+
+
+def _build_batch_cmd(
+    encoder: str,
+    jobs: List[Tuple[Path, str]],
+    output_paths: List[Path],
+    audio_args: List[str]
+) -> List[str]:
+    """
+    Build one FFmpeg command that burns subtitles into several videos.
+
+    Every input gets its own ass filter chain in a single filter graph
+    and is written to its own output, so process startup and encoder
+    initialization are paid once for the whole batch.
+
+    Args:
+        encoder: Encoder backend ("vaapi", "nvenc" or "libx264")
+        jobs: List of (input video path, path FFmpeg reads its ASS from)
+        output_paths: Path for each rendered video, in job order
+        audio_args: Audio codec arguments
+
+    Returns:
+        FFmpeg command as argument list
+    """
+    global_args: List[str] = []
+    inputs: List[str] = []
+    filters: List[str] = []
+    outputs: List[str] = []
+
+    for index, ((video_path, ass_path), output_path) in enumerate(
+        zip(jobs, output_paths)
+    ):
+        # Global arguments (e.g. the VAAPI device) are the same for every
+        # job and are emitted once, so all inputs share one hardware device
+        global_args, input_args, video_filter, video_args = _encoder_args(
+            encoder, ass_path
+        )
+
+        inputs += [*input_args, "-i", os.fspath(video_path)]
+        filters.append(f"[{index}:v]{video_filter}[v{index}]")
+        outputs += [
+            "-map", f"[v{index}]",
+            "-map", f"{index}:a?",
+            *video_args,
+            *audio_args,
+            "-movflags", "+faststart",  # Web optimization
+            os.fspath(output_path)
+        ]
+
+    return [
+        "ffmpeg",
+        "-y",  # Overwrite output
+        "-loglevel", "error",  # Only errors reach stderr
+        *global_args,
+        *inputs,
+        "-filter_complex", ";".join(filters),
+        *outputs
+    ]
+
+
 async def render_subtitles(
     video_path: Path,
-    ass_path: Path,
+    ass_content: bytes,
     output_path: Path = None
 ) -> Path:
     """
@@ -26,7 +323,7 @@ async def render_subtitles(
 
     Args:
         video_path: Path to input video
-        ass_path: Path to ASS subtitle file
+        ass_content: Encoded ASS subtitle file content
         output_path: Optional output path. Generated if not provided.
 
     Returns:
@@ -35,48 +332,210 @@ async def render_subtitles(
     Raises:
         RenderError: If rendering fails
     """
-    if output_path is None:
-        temp_dir = Path(settings.temp_dir)
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        output_id = str(uuid.uuid4())[:8]
-        output_path = temp_dir / f"{output_id}_output.mp4"
-
-    # FFmpeg command for burning subtitles
-    # Using ass filter for proper ASS rendering
-    cmd = [
-        "ffmpeg",
-        "-y",  # Overwrite output
-        "-i", str(video_path),
-        "-vf", f"ass={str(ass_path)}",
-        "-c:v", "libx264",  # H.264 video codec
-        "-preset", "fast",  # Encoding speed preset
-        "-crf", "23",  # Quality (lower = better, 18-28 is good range)
-        "-c:a", "aac",  # AAC audio codec
-        "-b:a", "128k",  # Audio bitrate
-        "-movflags", "+faststart",  # Web optimization
-        str(output_path)
-    ]
+    owns_output = output_path is None
+    if owns_output:
+        temp_dir = ensure_temp_dir()
+        output_path = temp_dir / tmp_name("_output.mp4")
+
+    try:
+        await _render_with_fallback(video_path, ass_content, output_path)
+    except BaseException:
+        # The caller never sees a generated name, so drop any partial output
+        if owns_output:
+            output_path.unlink(missing_ok=True)
+        raise
+
+    return output_path
+
+
+async def extract_and_render(
+    video_path: Path,
+    ass_content: bytes,
+    output_path: Path = None
+) -> Tuple[Path, Path]:
+    """
+    Extract the audio track and render subtitles in one FFmpeg process.
+
+    The input is decoded once and feeds both outputs, instead of running
+    extract_audio() and render_subtitles() separately. The video must
+    have an audio track.
+
+    Args:
+        video_path: Path to input video
+        ass_content: Encoded ASS subtitle file content
+        output_path: Optional output path. Generated if not provided.
+
+    Returns:
+        Tuple of (audio path as WAV 16kHz mono, rendered video path)
 
-    logger.info(f"Rendering video: {' '.join(cmd)}")
+    Raises:
+        RenderError: If the video has no audio track or rendering fails
+    """
+    # The audio output maps 0:a:0, so check up front (the probe is cached)
+    # instead of failing once per encoder in the fallback chain
+    try:
+        data = await probe_video(video_path)
+    except VideoError as e:
+        raise RenderError(str(e))
+
+    streams = data.get("streams", [])
+    if not any(stream.get("codec_type") == "audio" for stream in streams):
+        raise RenderError("Video has no audio track to extract")
+
+    owns_output = output_path is None
+    if owns_output:
+        temp_dir = ensure_temp_dir()
+        output_path = temp_dir / tmp_name("_output.mp4")
+
+    audio_path = video_path.with_suffix(".wav")
+
+    try:
+        await _render_with_fallback(video_path, ass_content, output_path, audio_path)
+    except BaseException:
+        # Neither path reaches the caller on failure, so drop partial outputs
+        audio_path.unlink(missing_ok=True)
+        if owns_output:
+            output_path.unlink(missing_ok=True)
+        raise
+
+    return audio_path, output_path
+
+
+async def render_batch(jobs: List[Tuple[Path, bytes]]) -> List[Path]:
+    """
+    Render several videos with hardcoded ASS subtitles in one FFmpeg process.
+
+    Args:
+        jobs: List of (input video path, encoded ASS subtitle content)
+
+    Returns:
+        Paths to the rendered videos, in the same order as `jobs`
+
+    Raises:
+        RenderError: If rendering fails
+    """
+    if not jobs:
+        return []
+
+    temp_dir = ensure_temp_dir()
+    output_paths = [temp_dir / tmp_name("_output.mp4") for _ in jobs]
+
+    # Try hardware encoders first, falling back to libx264
+    encoders = _encoder_chain()
+
+    with ExitStack() as stack:
+        ass_inputs = [
+            stack.enter_context(_ass_input(ass_content))
+            for _, ass_content in jobs
+        ]
+        pass_fds = tuple(fd for _, fds in ass_inputs for fd in fds)
+        batch = [
+            (video_path, ass_path)
+            for (video_path, _), (ass_path, _) in zip(jobs, ass_inputs)
+        ]
+
+        for encoder in encoders:
+            cmd = _build_batch_cmd(
+                encoder,
+                batch,
+                output_paths,
+                ["-c:a", "aac", "-b:a", "128k"]  # AAC audio, 128k bitrate
+            )
+
+            try:
+                await _run_render(cmd, output_paths, pass_fds)
+                return output_paths
+            except RenderError as e:
+                if encoder == encoders[-1]:
+                    # The caller never sees these names, so drop any
+                    # partially written outputs here
+                    for path in output_paths:
+                        path.unlink(missing_ok=True)
+                    raise
+                logger.warning(f"{encoder} batch render failed, trying next encoder: {e}")
+
+
+async def _render_with_fallback(
+    video_path: Path,
+    ass_content: bytes,
+    output_path: Path,
+    audio_output_path: Optional[Path] = None
+) -> None:
+    """
+    Render with each encoder in the chain until one succeeds.
+
+    Args:
+        video_path: Path to input video
+        ass_content: Encoded ASS subtitle file content
+        output_path: Path for the rendered video
+        audio_output_path: Optional path for an extracted audio track
+
+    Raises:
+        RenderError: If rendering fails with every encoder
+    """
+    # Try hardware encoders first, falling back to libx264
+    encoders = _encoder_chain()
+    output_paths = [output_path]
+    if audio_output_path is not None:
+        output_paths.append(audio_output_path)
+
+    with _ass_input(ass_content) as (ass_path, pass_fds):
+        for encoder in encoders:
+            cmd = _build_render_cmd(
+                encoder,
+                video_path,
+                ass_path,
+                output_path,
+                ["-c:a", "aac", "-b:a", "128k"],  # AAC audio, 128k bitrate
+                audio_output_path
+            )
+
+            try:
+                await _run_render(cmd, output_paths, pass_fds)
+                return
+            except RenderError as e:
+                if encoder == encoders[-1]:
+                    raise
+                logger.warning(f"{encoder} render failed, trying next encoder: {e}")
+
+
+async def _run_render(
+    cmd: List[str],
+    output_paths: List[Path],
+    pass_fds: Tuple[int, ...] = ()
+) -> None:
+    """
+    Run an FFmpeg render command.
+
+    Args:
+        cmd: FFmpeg command as argument list
+        output_paths: Every output path the command is expected to write
+        pass_fds: File descriptors the command needs to inherit
+
+    Raises:
+        RenderError: If rendering fails
+    """
+    logger.info("Rendering video: %s", cmd)
 
     try:
         process = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+            pass_fds=pass_fds
         )
-        stdout, stderr = await process.communicate()
+        _, stderr = await process.communicate()
 
         if process.returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
             logger.error(f"FFmpeg render failed: {error_msg}")
             raise RenderError(f"FFmpeg render failed: {error_msg}")
 
-        if not output_path.exists():
-            raise RenderError("Output file was not created")
+        missing = [path for path in output_paths if not path.exists()]
+        if missing:
+            raise RenderError(f"Output file was not created: {missing[0]}")
 
-        logger.info(f"Video rendered to {output_path}")
-        return output_path
+        logger.info(f"Video rendered to {', '.join(map(str, output_paths))}")
 
     except FileNotFoundError:
         raise RenderError("FFmpeg not found. Please install FFmpeg.")
@@ -88,7 +547,7 @@ async def render_subtitles(
 
 async def render_subtitles_with_copy(
     video_path: Path,
-    ass_path: Path,
+    ass_content: bytes,
     output_path: Path = None
 ) -> Path:
     """
@@ -99,7 +558,7 @@ async def render_subtitles_with_copy(
 
     Args:
         video_path: Path to input video
-        ass_path: Path to ASS subtitle file
+        ass_content: Encoded ASS subtitle file content
         output_path: Optional output path
 
     Returns:
@@ -108,34 +567,29 @@ async def render_subtitles_with_copy(
     # Subtitles require video re-encoding (can't use -c:v copy with filters)
     # But we can try to copy audio
     if output_path is None:
-        temp_dir = Path(settings.temp_dir)
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        output_id = str(uuid.uuid4())[:8]
-        output_path = temp_dir / f"{output_id}_output.mp4"
-
-    # Try with audio copy first
-    cmd = [
-        "ffmpeg",
-        "-y",
-        "-i", str(video_path),
-        "-vf", f"ass={str(ass_path)}",
-        "-c:v", "libx264",
-        "-preset", "fast",
-        "-crf", "23",
-        "-c:a", "copy",  # Try to copy audio
-        "-movflags", "+faststart",
-        str(output_path)
-    ]
-
-    logger.info(f"Rendering video (audio copy): {' '.join(cmd)}")
+        temp_dir = ensure_temp_dir()
+        output_path = temp_dir / tmp_name("_output.mp4")
 
     try:
-        process = await asyncio.create_subprocess_exec(
-            *cmd,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
+        with _ass_input(ass_content) as (ass_path, pass_fds):
+            # Try with audio copy first, using the preferred encoder
+            cmd = _build_render_cmd(
+                _encoder_chain()[0],
+                video_path,
+                ass_path,
+                output_path,
+                ["-c:a", "copy"]  # Try to copy audio
+            )
+
+            logger.info("Rendering video (audio copy): %s", cmd)
+
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                pass_fds=pass_fds
+            )
+            _, stderr = await process.communicate()
 
         if process.returncode == 0 and output_path.exists():
             logger.info(f"Video rendered with audio copy to {output_path}")
@@ -143,23 +597,21 @@ async def render_subtitles_with_copy(
 
         # Fall back to full re-encode
         logger.warning("Audio copy failed, falling back to full re-encode")
-        return await render_subtitles(video_path, ass_path, output_path)
+        return await render_subtitles(video_path, ass_content, output_path)
 
     except Exception:
-        return await render_subtitles(video_path, ass_path, output_path)
+        return await render_subtitles(video_path, ass_content, output_path)
 
 
-def check_ffmpeg_available() -> bool:
+def _check_ffmpeg_available_sync() -> bool:
     """
-    Check if FFmpeg is available on the system.
+    Check if FFmpeg is available on the system (blocking).
 
     Returns:
         True if FFmpeg is available
     """
-    import subprocess
-
     try:
-        result = subprocess.run(
+        subprocess.run(
             ["ffmpeg", "-version"],
             capture_output=True,
             check=True
@@ -167,3 +619,21 @@ def check_ffmpeg_available() -> bool:
         return True
     except (FileNotFoundError, subprocess.CalledProcessError):
         return False
+
+
+async def check_ffmpeg_available() -> bool:
+    """
+    Check if FFmpeg is available on the system.
+
+    The check runs in a worker thread once per process; the result
+    cannot change while the service is running and is cached.
+
+    Returns:
+        True if FFmpeg is available
+    """
+    global _ffmpeg_available
+
+    if _ffmpeg_available is None:
+        _ffmpeg_available = await asyncio.to_thread(_check_ffmpeg_available_sync)
+
+    return _ffmpeg_available
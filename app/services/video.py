@@ -1,31 +1,103 @@
 """Video download and processing service."""
 
 import asyncio
+import contextlib
 import logging
-import subprocess
-import uuid
+import os
+from collections import OrderedDict
 from pathlib import Path
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 
 import httpx
+import orjson
 
 from app.config import get_settings
+from app.tempfiles import ensure_temp_dir, tmp_name
 
-settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Streaming download sizes: network chunk and file write buffer
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Shared HTTP client and download limiter, created lazily on first use
+_client: Optional[httpx.AsyncClient] = None
+_download_semaphore: Optional[asyncio.Semaphore] = None
+
+# Limits concurrent ffprobe processes, created lazily on first use
+_probe_semaphore: Optional[asyncio.Semaphore] = None
+
+# ffprobe results keyed by (path, mtime_ns), least recently used first
+PROBE_CACHE_SIZE = 128
+_probe_cache: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+
 
 class VideoError(Exception):
     """Custom exception for video processing errors."""
     pass
 
 
-async def download_video(url: str) -> Path:
+def get_client() -> httpx.AsyncClient:
     """
-    Download video from URL to temp directory.
+    Get the shared HTTP client, creating it on first use.
+
+    Reusing one HTTP/2-capable client keeps connections alive across
+    downloads and lets requests to the same host share a connection.
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    global _client
+
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            limits=httpx.Limits(max_keepalive_connections=16, max_connections=32),
+            follow_redirects=True
+        )
+
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared HTTP client, if it was created."""
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _get_download_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent downloads."""
+    global _download_semaphore
+
+    if _download_semaphore is None:
+        _download_semaphore = asyncio.Semaphore(
+            get_settings().max_parallel_downloads
+        )
+
+    return _download_semaphore
+
+
+def _get_probe_semaphore() -> asyncio.Semaphore:
+    """Get the semaphore bounding concurrent ffprobe processes."""
+    global _probe_semaphore
+
+    if _probe_semaphore is None:
+        _probe_semaphore = asyncio.Semaphore(get_settings().probe_workers)
+
+    return _probe_semaphore
+
+
+async def _download_to_path(url: str, video_path: Path) -> Path:
+    """
+    Stream a single URL to a file.
 
     Args:
         url: URL of the video to download
+        video_path: Destination path
 
     Returns:
         Path to the downloaded video file
@@ -33,36 +105,89 @@ async def download_video(url: str) -> Path:
     Raises:
         VideoError: If download fails
     """
-    temp_dir = Path(settings.temp_dir)
-    temp_dir.mkdir(parents=True, exist_ok=True)
-
-    # Generate unique filename
-    video_id = str(uuid.uuid4())[:8]
-    video_path = temp_dir / f"{video_id}_input.mp4"
-
     logger.info(f"Downloading video from {url}")
 
     try:
-        async with httpx.AsyncClient(timeout=60.0, follow_redirects=True) as client:
-            response = await client.get(str(url))
-            response.raise_for_status()
+        async with _get_download_semaphore():
+            # Stream to disk so memory stays bounded by the chunk size
+            async with get_client().stream("GET", str(url)) as response:
+                response.raise_for_status()
 
-            with open(video_path, "wb") as f:
-                f.write(response.content)
+                with open(video_path, "wb", buffering=DOWNLOAD_BUFFER_SIZE) as f:
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
 
         logger.info(f"Video downloaded to {video_path}")
         return video_path
 
     except httpx.HTTPError as e:
+        cleanup_files(video_path)  # Drop any partially streamed file
         raise VideoError(f"Failed to download video: {e}")
     except Exception as e:
+        cleanup_files(video_path)
         raise VideoError(f"Unexpected error downloading video: {e}")
+    except BaseException:
+        # Cancelled mid-stream (e.g. a sibling download failed): the caller
+        # never receives this path, so the partial file must go too
+        cleanup_files(video_path)
+        raise
+
+
+async def download_videos(urls: List[str]) -> List[Path]:
+    """
+    Download several videos concurrently to the temp directory.
+
+    Args:
+        urls: URLs of the videos to download
+
+    Returns:
+        Paths to the downloaded files, in the same order as `urls`
+
+    Raises:
+        VideoError: If any download fails. Files from successful
+            downloads are removed before raising.
+    """
+    temp_dir = ensure_temp_dir()
+
+    # Generate unique filenames
+    video_paths = [temp_dir / tmp_name("_input.mp4") for _ in urls]
+
+    results = await asyncio.gather(
+        *(_download_to_path(url, path) for url, path in zip(urls, video_paths)),
+        return_exceptions=True
+    )
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    if errors:
+        cleanup_files(*(r for r in results if isinstance(r, Path)))
+        raise errors[0]
+
+    return results
+
+
+async def download_video(url: str) -> Path:
+    """
+    Download video from URL to temp directory.
+
+    Args:
+        url: URL of the video to download
+
+    Returns:
+        Path to the downloaded video file
+
+    Raises:
+        VideoError: If download fails
+    """
+    return (await download_videos([url]))[0]
 
 
 async def extract_audio(video_path: Path) -> Path:
     """
     Extract audio from video as WAV 16kHz mono.
 
+    If the call is cancelled, FFmpeg is killed and the partial audio
+    file is removed.
+
     Args:
         video_path: Path to the input video
 
@@ -77,23 +202,37 @@ async def extract_audio(video_path: Path) -> Path:
     cmd = [
         "ffmpeg",
         "-y",  # Overwrite output
-        "-i", str(video_path),
+        "-loglevel", "error",  # Only errors reach stderr
+        "-i", os.fspath(video_path),
         "-vn",  # No video
         "-acodec", "pcm_s16le",  # PCM 16-bit
         "-ar", "16000",  # 16kHz sample rate
         "-ac", "1",  # Mono
-        str(audio_path)
+        os.fspath(audio_path)
     ]
 
-    logger.info(f"Extracting audio: {' '.join(cmd)}")
+    logger.info("Extracting audio: %s", cmd)
 
     try:
         process = await asyncio.create_subprocess_exec(
             *cmd,
-            stdout=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.PIPE
         )
-        stdout, stderr = await process.communicate()
+        try:
+            _, stderr = await process.communicate()
+        except asyncio.CancelledError:
+            # Stop FFmpeg instead of letting it decode the rest of the
+            # track, and reap it before dropping the output. It may have
+            # exited already, which kill() reports as ProcessLookupError.
+            try:
+                if process.returncode is None:
+                    with contextlib.suppress(ProcessLookupError):
+                        process.kill()
+                    await process.wait()
+            finally:
+                cleanup_files(audio_path)
+            raise
 
         if process.returncode != 0:
             error_msg = stderr.decode() if stderr else "Unknown error"
@@ -110,45 +249,96 @@ async def extract_audio(video_path: Path) -> Path:
         raise VideoError(f"Audio extraction failed: {e}")
 
 
-def get_video_duration(video_path: Path) -> float:
+async def probe_video(video_path: Path) -> dict:
     """
-    Get video duration in seconds using ffprobe.
+    Probe video format and stream metadata with a single ffprobe call.
+
+    Results are cached per (path, mtime), so repeated lookups for the
+    same file do not spawn another process. At most
+    `settings.probe_workers` ffprobe processes run at once.
 
     Args:
         video_path: Path to the video file
 
     Returns:
-        Duration in seconds
+        Parsed ffprobe JSON with "format" and "streams" keys
 
     Raises:
-        VideoError: If duration cannot be determined
+        VideoError: If the video cannot be probed
     """
+    path = os.fspath(video_path)
+
+    try:
+        cache_key = (path, os.stat(path).st_mtime_ns)
+    except OSError as e:
+        raise VideoError(f"Could not probe video: {e}")
+
+    cached = _probe_cache.get(cache_key)
+    if cached is not None:
+        _probe_cache.move_to_end(cache_key)
+        return cached
+
     cmd = [
         "ffprobe",
         "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
-        str(video_path)
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        path
     ]
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        duration = float(result.stdout.strip())
-        logger.info(f"Video duration: {duration}s")
-        return duration
-
+        async with _get_probe_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
     except FileNotFoundError:
         raise VideoError("FFprobe not found. Please install FFmpeg.")
-    except (subprocess.CalledProcessError, ValueError) as e:
+
+    if process.returncode != 0:
+        error_msg = stderr.decode() if stderr else "Unknown error"
+        raise VideoError(f"Could not probe video: {error_msg}")
+
+    try:
+        data = orjson.loads(stdout)
+    except orjson.JSONDecodeError as e:
+        raise VideoError(f"Could not parse ffprobe output: {e}")
+
+    _probe_cache[cache_key] = data
+    if len(_probe_cache) > PROBE_CACHE_SIZE:
+        _probe_cache.popitem(last=False)
+
+    return data
+
+
+async def get_video_duration(video_path: Path) -> float:
+    """
+    Get video duration in seconds using ffprobe.
+
+    Args:
+        video_path: Path to the video file
+
+    Returns:
+        Duration in seconds
+
+    Raises:
+        VideoError: If duration cannot be determined
+    """
+    data = await probe_video(video_path)
+
+    try:
+        duration = float(data["format"]["duration"])
+    except (KeyError, TypeError, ValueError) as e:
         raise VideoError(f"Could not determine video duration: {e}")
 
+    logger.info("Video duration: %ss", duration)
+    return duration
+
 
-def get_video_resolution(video_path: Path) -> Tuple[int, int]:
+async def get_video_resolution(video_path: Path) -> Tuple[int, int]:
     """
     Get video resolution (width, height) using ffprobe.
 
@@ -161,30 +351,19 @@ def get_video_resolution(video_path: Path) -> Tuple[int, int]:
     Raises:
         VideoError: If resolution cannot be determined
     """
-    cmd = [
-        "ffprobe",
-        "-v", "error",
-        "-select_streams", "v:0",
-        "-show_entries", "stream=width,height",
-        "-of", "csv=s=x:p=0",
-        str(video_path)
-    ]
+    data = await probe_video(video_path)
 
-    try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        width, height = map(int, result.stdout.strip().split("x"))
-        logger.info(f"Video resolution: {width}x{height}")
-        return width, height
+    for stream in data.get("streams", []):
+        if stream.get("codec_type") == "video":
+            try:
+                width, height = int(stream["width"]), int(stream["height"])
+            except (KeyError, TypeError, ValueError) as e:
+                raise VideoError(f"Could not determine video resolution: {e}")
 
-    except FileNotFoundError:
-        raise VideoError("FFprobe not found. Please install FFmpeg.")
-    except (subprocess.CalledProcessError, ValueError) as e:
-        raise VideoError(f"Could not determine video resolution: {e}")
+            logger.info("Video resolution: %dx%d", width, height)
+            return width, height
+
+    raise VideoError("Could not determine video resolution: no video stream")
 
 
 def cleanup_files(*paths: Path) -> None:
@@ -0,0 +1,48 @@
+"""Temporary file helpers shared by the services."""
+
+import itertools
+import os
+from pathlib import Path
+from typing import Optional
+
+from app.config import get_settings
+
+# Temp directory already created by this process
+_created_temp_dir: Optional[Path] = None
+
+# Per-process counter for unique temp file names
+_tmp_counter = itertools.count()
+
+
+def ensure_temp_dir() -> Path:
+    """
+    Get the temp directory, creating it on first use.
+
+    The created directory is remembered, so mkdir only runs again when
+    `settings.temp_dir` points somewhere else.
+
+    Returns:
+        Path to the temp directory
+    """
+    global _created_temp_dir
+
+    temp_dir = Path(get_settings().temp_dir)
+
+    if temp_dir != _created_temp_dir:
+        temp_dir.mkdir(parents=True, exist_ok=True)
+        _created_temp_dir = temp_dir
+
+    return temp_dir
+
+
+def tmp_name(suffix: str) -> str:
+    """
+    Build a process-unique temp file name.
+
+    Args:
+        suffix: Name suffix, including the extension
+
+    Returns:
+        File name of the form "<pid>_<n><suffix>"
+    """
+    return f"{os.getpid()}_{next(_tmp_counter)}{suffix}"
@@ -1,12 +1,15 @@
 """ASS subtitle style presets."""
 
+import dataclasses
+import operator
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ASSStyle:
-    """ASS subtitle style definition."""
+    """ASS subtitle style definition (immutable and hashable)."""
 
     name: str
     fontname: str
@@ -34,22 +37,29 @@ class ASSStyle:
 
     def to_ass_line(self) -> str:
         """Convert to ASS Style line format."""
-        return (
-            f"Style: {self.name},{self.fontname},{self.fontsize},"
-            f"{self.primary_color},{self.secondary_color},"
-            f"{self.outline_color},{self.back_color},"
-            f"{self.bold},{self.italic},{self.underline},{self.strikeout},"
-            f"{self.scale_x},{self.scale_y},{self.spacing},{self.angle},"
-            f"{self.border_style},{self.outline},{self.shadow},"
-            f"{self.alignment},{self.margin_l},{self.margin_r},{self.margin_v},"
-            f"{self.encoding}"
-        )
+        return "Style: " + ",".join(map(str, _STYLE_FIELDS(self)))
+
+
+# Reads all ASSStyle fields, in ASS Format order, in a single C-level call
+_STYLE_FIELDS = operator.attrgetter(
+    "name", "fontname", "fontsize",
+    "primary_color", "secondary_color", "outline_color", "back_color",
+    "bold", "italic", "underline", "strikeout",
+    "scale_x", "scale_y", "spacing", "angle",
+    "border_style", "outline", "shadow",
+    "alignment", "margin_l", "margin_r", "margin_v",
+    "encoding"
+)
 
 
 def get_style_for_resolution(preset_name: str, width: int, height: int) -> ASSStyle:
     """
     Get style adjusted for video resolution.
 
+    Scaling only depends on the height, so results are cached per
+    (preset, height); styles are immutable, so the cached instance is
+    safely shared between callers.
+
     Args:
         preset_name: Name of the style preset
         width: Video width
@@ -58,24 +68,35 @@ def get_style_for_resolution(preset_name: str, width: int, height: int) -> ASSSt
     Returns:
         ASSStyle adjusted for resolution
     """
-    # Base font size scaling
-    # Reference: 1080p (1920x1080) = base size
-    scale_factor = height / 1080.0
+    return _scaled_style(preset_name, height)
 
-    presets = get_style_presets()
 
-    if preset_name not in presets:
-        preset_name = "tiktok_clean"
+@lru_cache(maxsize=64)
+def _scaled_style(preset_name: str, height: int) -> ASSStyle:
+    """
+    Scale a preset for a video height.
+
+    Args:
+        preset_name: Name of the style preset
+        height: Video height
 
-    style = presets[preset_name]
+    Returns:
+        ASSStyle adjusted for the height
+    """
+    # Base font size scaling
+    # Reference: 1080p (1920x1080) = base size
+    scale_factor = height / 1080.0
 
-    # Scale font size and margins
-    style.fontsize = int(style.fontsize * scale_factor)
-    style.margin_v = int(style.margin_v * scale_factor)
-    style.outline = round(style.outline * scale_factor, 1)
-    style.shadow = round(style.shadow * scale_factor, 1)
+    base = _PRESETS.get(preset_name, _PRESETS["tiktok_clean"])
 
-    return style
+    # Scale font size and margins into a new style
+    return dataclasses.replace(
+        base,
+        fontsize=int(base.fontsize * scale_factor),
+        margin_v=int(base.margin_v * scale_factor),
+        outline=round(base.outline * scale_factor, 1),
+        shadow=round(base.shadow * scale_factor, 1)
+    )
 
 
 def get_style_presets() -> Dict[str, ASSStyle]:
@@ -85,89 +106,93 @@ def get_style_presets() -> Dict[str, ASSStyle]:
     Returns:
         Dictionary of preset name to ASSStyle
     """
-    return {
-        "tiktok_clean": ASSStyle(
-            name="Default",
-            fontname="Inter",
-            fontsize=48,  # Will be scaled
-            # White color in ASS BGR format: &H00FFFFFF (with alpha)
-            primary_color="&H00FFFFFF",
-            secondary_color="&H000000FF",
-            # Black outline
-            outline_color="&H00000000",
-            # Semi-transparent black shadow
-            back_color="&H80000000",
-            bold=-1,  # Bold enabled
-            italic=0,
-            underline=0,
-            strikeout=0,
-            scale_x=100,
-            scale_y=100,
-            spacing=0,
-            angle=0.0,
-            border_style=1,  # Outline + shadow
-            outline=2.5,
-            shadow=1.5,
-            alignment=2,  # Bottom center
-            margin_l=40,
-            margin_r=40,
-            margin_v=80,  # Will be scaled
-            encoding=1
-        ),
-
-        "tiktok_bold": ASSStyle(
-            name="Default",
-            fontname="Inter",
-            fontsize=56,
-            primary_color="&H00FFFFFF",
-            secondary_color="&H000000FF",
-            outline_color="&H00000000",
-            back_color="&H80000000",
-            bold=-1,
-            italic=0,
-            underline=0,
-            strikeout=0,
-            scale_x=100,
-            scale_y=100,
-            spacing=1,
-            angle=0.0,
-            border_style=1,
-            outline=3.0,
-            shadow=2.0,
-            alignment=2,
-            margin_l=40,
-            margin_r=40,
-            margin_v=100,
-            encoding=1
-        ),
-
-        "minimal": ASSStyle(
-            name="Default",
-            fontname="Arial",
-            fontsize=40,
-            primary_color="&H00FFFFFF",
-            secondary_color="&H000000FF",
-            outline_color="&H00000000",
-            back_color="&H00000000",
-            bold=0,
-            italic=0,
-            underline=0,
-            strikeout=0,
-            scale_x=100,
-            scale_y=100,
-            spacing=0,
-            angle=0.0,
-            border_style=1,
-            outline=1.5,
-            shadow=0,
-            alignment=2,
-            margin_l=20,
-            margin_r=20,
-            margin_v=60,
-            encoding=1
-        ),
-    }
+    return dict(_PRESETS)
+
+
+# Base presets, built once at import
+_PRESETS: Dict[str, ASSStyle] = {
+    "tiktok_clean": ASSStyle(
+        name="Default",
+        fontname="Inter",
+        fontsize=48,  # Will be scaled
+        # White color in ASS BGR format: &H00FFFFFF (with alpha)
+        primary_color="&H00FFFFFF",
+        secondary_color="&H000000FF",
+        # Black outline
+        outline_color="&H00000000",
+        # Semi-transparent black shadow
+        back_color="&H80000000",
+        bold=-1,  # Bold enabled
+        italic=0,
+        underline=0,
+        strikeout=0,
+        scale_x=100,
+        scale_y=100,
+        spacing=0,
+        angle=0.0,
+        border_style=1,  # Outline + shadow
+        outline=2.5,
+        shadow=1.5,
+        alignment=2,  # Bottom center
+        margin_l=40,
+        margin_r=40,
+        margin_v=80,  # Will be scaled
+        encoding=1
+    ),
+
+    "tiktok_bold": ASSStyle(
+        name="Default",
+        fontname="Inter",
+        fontsize=56,
+        primary_color="&H00FFFFFF",
+        secondary_color="&H000000FF",
+        outline_color="&H00000000",
+        back_color="&H80000000",
+        bold=-1,
+        italic=0,
+        underline=0,
+        strikeout=0,
+        scale_x=100,
+        scale_y=100,
+        spacing=1,
+        angle=0.0,
+        border_style=1,
+        outline=3.0,
+        shadow=2.0,
+        alignment=2,
+        margin_l=40,
+        margin_r=40,
+        margin_v=100,
+        encoding=1
+    ),
+
+    "minimal": ASSStyle(
+        name="Default",
+        fontname="Arial",
+        fontsize=40,
+        primary_color="&H00FFFFFF",
+        secondary_color="&H000000FF",
+        outline_color="&H00000000",
+        back_color="&H00000000",
+        bold=0,
+        italic=0,
+        underline=0,
+        strikeout=0,
+        scale_x=100,
+        scale_y=100,
+        spacing=0,
+        angle=0.0,
+        border_style=1,
+        outline=1.5,
+        shadow=0,
+        alignment=2,
+        margin_l=20,
+        margin_r=20,
+        margin_v=60,
+        encoding=1
+    ),
+}
 
 
 # List of available presets for validation
-AVAILABLE_PRESETS = list(get_style_presets().keys())
+AVAILABLE_PRESETS = list(_PRESETS)
@@ -0,0 +1,26 @@
+"""Shared test fixtures."""
+
+import os
+
+import pytest
+
+
+@pytest.fixture
+def fake_binary(monkeypatch, tmp_path):
+    """
+    Install fake executables on PATH.
+
+    Returns a function taking the executable name and its script text;
+    it returns the directory the executable was written to.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+
+    def install(name: str, script: str):
+        path = bin_dir / name
+        path.write_text(script)
+        path.chmod(0o755)
+        return bin_dir
+
+    return install
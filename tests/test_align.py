@@ -1,17 +1,35 @@
 """Tests for the align endpoint and alignment service."""
 
+import asyncio
+import os
+import wave
+
 import pytest
 from fastapi.testclient import TestClient
 
 from app.main import app
 from app.config import get_settings
 from app.models.schemas import Segment
-from app.services.alignment import _split_into_sentences, _normalize_segments
+from app.routers import align
+from app.services.alignment import (
+    _split_into_sentences,
+    _normalize_segments,
+    _fallback_alignment
+)
 
 
 # Test settings override
 settings = get_settings()
 
+# Stand-in for a long audio extraction: records its pid, creates the
+# output file and keeps running until it is killed
+SLOW_FFMPEG = """#!/bin/sh
+for last; do :; done
+: > "$last"
+echo $$ > "$(dirname "$0")/ffmpeg.pid"
+exec sleep 30
+"""
+
 
 @pytest.fixture
 def client():
@@ -68,6 +86,7 @@ class TestSegmentNormalization:
         normalized = _normalize_segments(segments)
         assert len(normalized) == 2
         assert normalized[0].text == "Short text"
+        assert normalized[0] is segments[0]
 
     def test_normalize_long_segment(self):
         """Test that long segments are split into lines."""
@@ -78,6 +97,47 @@ class TestSegmentNormalization:
         # Should contain line break
         assert "\n" in normalized[0].text or len(normalized[0].text) <= 80
 
+    def test_normalize_line_length_limit(self):
+        """Test that wrapped lines respect the per-line character limit."""
+        long_text = " ".join(["word"] * 40)
+        segments = [Segment(start=0.0, end=5.0, text=long_text)]
+        normalized = _normalize_segments(segments, max_chars=80, max_lines=2)
+        lines = normalized[0].text.split("\n")
+        assert len(lines) == 2
+        assert lines[0] == " ".join(["word"] * 8)
+        assert all(len(line) <= 40 for line in lines)
+
+
+class TestFallbackAlignment:
+    """Tests for the evenly distributed fallback alignment."""
+
+    def test_fallback_segments_are_contiguous(self, tmp_path):
+        """Test that segments follow each other without gaps."""
+        sentences = ["Hello world", "A", "This is a longer sentence"]
+        segments = _fallback_alignment(sentences, tmp_path / "missing.wav")
+
+        assert [s.text for s in segments] == sentences
+        assert segments[0].start == 0.0
+        for previous, current in zip(segments, segments[1:]):
+            assert current.start == previous.end
+
+    def test_fallback_minimum_duration(self, tmp_path):
+        """Test that short sentences get at least the minimum duration."""
+        segments = _fallback_alignment(["A", "B" * 200], tmp_path / "missing.wav")
+        assert segments[0].end - segments[0].start >= 0.5
+
+    def test_fallback_uses_wav_duration(self, tmp_path):
+        """Test that timings span the duration read from the WAV header."""
+        audio_path = tmp_path / "audio.wav"
+        with wave.open(str(audio_path), "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(b"\x00\x00" * 16000 * 4)
+
+        segments = _fallback_alignment(["Hello there", "General Kenobi"], audio_path)
+        assert segments[-1].end == pytest.approx(4.0, abs=0.01)
+
 
 class TestAlignEndpoint:
     """Tests for the /align endpoint."""
@@ -128,6 +188,41 @@ class TestAlignEndpoint:
         )
         assert response.status_code == 422
 
+    def test_align_too_long_stops_extraction(
+        self, client, api_key, fake_binary, monkeypatch, tmp_path
+    ):
+        """Test that an over-long video kills the running audio extraction."""
+        pid_file = fake_binary("ffmpeg", SLOW_FFMPEG) / "ffmpeg.pid"
+
+        video_path = tmp_path / "in.mp4"
+
+        async def fake_download(url):
+            video_path.write_bytes(b"")
+            return video_path
+
+        async def fake_duration(path):
+            # Report the duration only once extraction is under way
+            while not pid_file.exists():
+                await asyncio.sleep(0.01)
+            return align.MAX_VIDEO_DURATION + 1.0
+
+        monkeypatch.setattr(align, "download_video", fake_download)
+        monkeypatch.setattr(align, "get_video_duration", fake_duration)
+
+        response = client.post(
+            "/align",
+            headers={"X-API-Key": api_key},
+            json={
+                "video_url": "https://example.com/video.mp4",
+                "script_text": "Hello world"
+            }
+        )
+
+        assert response.status_code == 413
+        with pytest.raises(ProcessLookupError):
+            os.kill(int(pid_file.read_text()), 0)
+        assert list(tmp_path.glob("in.*")) == []
+
 
 class TestHealthEndpoint:
     """Tests for the /health endpoint."""
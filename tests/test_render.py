@@ -1,16 +1,23 @@
 """Tests for the render endpoint and related services."""
 
+import dataclasses
+import json
+import sys
+
 import pytest
 from fastapi.testclient import TestClient
+from pydantic import ValidationError
 
 from app.main import app
-from app.config import get_settings
+from app.config import Settings, get_settings
 from app.models.schemas import Segment
 from app.services.ass_generator import (
     generate_ass,
+    save_ass_file,
     _seconds_to_ass_time,
     _escape_ass_text
 )
+from app.services import ffmpeg
 from app.templates.styles import (
     get_style_presets,
     get_style_for_resolution,
@@ -20,6 +27,31 @@ from app.templates.styles import (
 
 settings = get_settings()
 
+# Stand-in for ffmpeg: logs the video codec and ASS content of each call,
+# writes every output and fails for codecs listed in FAKE_FFMPEG_FAIL
+FAKE_FFMPEG = """#!{python}
+import json, os, re, sys
+
+args = sys.argv[1:]
+codec = args[args.index("-c:v") + 1]
+ass = [
+    open(path).read()
+    for arg in args
+    for path in re.findall(r"ass=([^,;\\[]+)", arg)
+]
+log = os.path.join(os.path.dirname(sys.argv[0]), "calls.log")
+with open(log, "a") as f:
+    f.write(json.dumps({{"codec": codec, "ass": ass}}) + "\\n")
+
+for prev, arg in zip(args, args[1:]):
+    if prev != "-i" and arg.endswith((".mp4", ".wav")):
+        with open(arg, "wb") as f:
+            f.write(b"rendered")
+
+if codec in os.environ.get("FAKE_FFMPEG_FAIL", "").split(","):
+    sys.exit("encoder failed")
+"""
+
 
 @pytest.fixture
 def client():
@@ -43,6 +75,26 @@ def sample_segments():
     ]
 
 
+@pytest.fixture
+def fake_ffmpeg(fake_binary, monkeypatch, tmp_path):
+    """Put a fake ffmpeg on PATH and render into an empty temp directory."""
+    bin_dir = fake_binary("ffmpeg", FAKE_FFMPEG.format(python=sys.executable))
+
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+
+    monkeypatch.setattr(settings, "temp_dir", work_dir)
+    monkeypatch.setattr(ffmpeg, "_encoder_chain", lambda: ["libx264"])
+
+    def calls():
+        log = bin_dir / "calls.log"
+        if not log.exists():
+            return []
+        return [json.loads(line) for line in log.read_text().splitlines()]
+
+    return calls
+
+
 class TestTimeConversion:
     """Tests for ASS time format conversion."""
 
@@ -66,6 +118,11 @@ class TestTimeConversion:
         """Test centisecond precision."""
         assert _seconds_to_ass_time(1.99) == "0:00:01.99"
 
+    def test_float_artifacts(self):
+        """Test values that are not exact in binary floating point."""
+        assert _seconds_to_ass_time(0.29) == "0:00:00.29"
+        assert _seconds_to_ass_time(3599.999) == "1:00:00.00"
+
 
 class TestTextEscaping:
     """Tests for ASS text escaping."""
@@ -84,6 +141,10 @@ class TestTextEscaping:
         result = _escape_ass_text(text)
         assert result == "Line 1\\NLine 2\\NLine 3"
 
+    def test_crlf_newlines(self):
+        """Test Windows line endings collapse to a single ASS line break."""
+        assert _escape_ass_text("Line 1\r\nLine 2") == "Line 1\\NLine 2"
+
 
 class TestStylePresets:
     """Tests for style presets."""
@@ -110,6 +171,28 @@ class TestStylePresets:
         # 720p should have smaller font
         assert style_720p.fontsize < style_1080p.fontsize
 
+    def test_resolution_scaling_keeps_presets(self):
+        """Test that scaling does not modify the base presets."""
+        base_size = get_style_presets()["minimal"].fontsize
+        get_style_for_resolution("minimal", 3840, 2160)
+        assert get_style_presets()["minimal"].fontsize == base_size
+
+    def test_styles_are_immutable(self):
+        """Test that shared style instances cannot be modified."""
+        style = get_style_presets()["tiktok_clean"]
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            style.fontsize = 10
+
+    def test_resolution_style_is_cached(self):
+        """Test that repeated lookups reuse the scaled style."""
+        first = get_style_for_resolution("tiktok_bold", 1080, 1920)
+        second = get_style_for_resolution("tiktok_bold", 1080, 1920)
+        assert first is second
+        assert first.to_ass_line() == second.to_ass_line()
+
+        # Width does not affect scaling, so it shares the cache entry
+        assert get_style_for_resolution("tiktok_bold", 720, 1920) is first
+
     def test_unknown_preset_fallback(self):
         """Test that unknown preset falls back to tiktok_clean."""
         style = get_style_for_resolution("nonexistent", 1920, 1080)
@@ -157,6 +240,239 @@ class TestASSGeneration:
         dialogue_count = ass_content.count("Dialogue:")
         assert dialogue_count == len(sample_segments)
 
+    def test_save_ass_file_matches_generated(self, sample_segments, tmp_path):
+        """Test that the streamed file matches the generated content."""
+        output_path = save_ass_file(
+            segments=sample_segments,
+            style_preset="tiktok_clean",
+            resolution=(1920, 1080),
+            output_path=tmp_path / "subs.ass"
+        )
+
+        expected = generate_ass(
+            segments=sample_segments,
+            style_preset="tiktok_clean",
+            resolution=(1920, 1080)
+        )
+        assert output_path.read_text(encoding="utf-8") == expected + "\n"
+
+
+class TestRenderCommand:
+    """Tests for FFmpeg render command construction."""
+
+    def test_libx264_command(self, tmp_path):
+        """Test the CPU encoder command burns subtitles with libx264."""
+        cmd = ffmpeg._build_render_cmd(
+            "libx264",
+            tmp_path / "in.mp4",
+            "/dev/fd/3",
+            tmp_path / "out.mp4",
+            ["-c:a", "copy"]
+        )
+        assert cmd[cmd.index("-c:v") + 1] == "libx264"
+        assert cmd[cmd.index("-preset") + 1] == settings.x264_preset
+        assert cmd[cmd.index("-tune") + 1] == settings.x264_tune
+        assert cmd[cmd.index("-vf") + 1] == "ass=/dev/fd/3"
+        assert "-hwaccel" not in cmd
+
+    def test_nvenc_command(self, tmp_path):
+        """Test the NVENC command keeps the ass overlay on the CPU."""
+        cmd = ffmpeg._build_render_cmd(
+            "nvenc",
+            tmp_path / "in.mp4",
+            "/dev/fd/3",
+            tmp_path / "out.mp4",
+            ["-c:a", "copy"]
+        )
+        assert cmd[cmd.index("-c:v") + 1] == "h264_nvenc"
+        assert cmd.index("-hwaccel") < cmd.index("-i")
+        assert cmd[cmd.index("-vf") + 1].startswith("hwdownload,format=nv12,ass=")
+
+    def test_vaapi_command(self, tmp_path):
+        """Test the VAAPI command uploads frames after the ass overlay."""
+        cmd = ffmpeg._build_render_cmd(
+            "vaapi",
+            tmp_path / "in.mp4",
+            "/dev/fd/3",
+            tmp_path / "out.mp4",
+            ["-c:a", "copy"]
+        )
+        assert cmd[cmd.index("-c:v") + 1] == "h264_vaapi"
+        assert cmd[cmd.index("-vf") + 1].endswith(",format=nv12|vaapi,hwupload")
+
+    def test_command_with_audio_output(self, tmp_path):
+        """Test that audio extraction is added as a first output."""
+        cmd = ffmpeg._build_render_cmd(
+            "libx264",
+            tmp_path / "in.mp4",
+            "/dev/fd/3",
+            tmp_path / "out.mp4",
+            ["-c:a", "copy"],
+            tmp_path / "in.wav"
+        )
+        audio_index = cmd.index(str(tmp_path / "in.wav"))
+        assert cmd[cmd.index("-ar") + 1] == "16000"
+        assert cmd.index("-vn") < audio_index < cmd.index("-vf")
+        assert cmd[audio_index + 1:audio_index + 5] == ["-map", "0:v:0", "-map", "0:a?"]
+        assert cmd[-1] == str(tmp_path / "out.mp4")
+
+    def test_batch_command(self, tmp_path):
+        """Test that each batch job gets its own filter chain and output."""
+        cmd = ffmpeg._build_batch_cmd(
+            "libx264",
+            [(tmp_path / "a.mp4", "/dev/fd/3"), (tmp_path / "b.mp4", "/dev/fd/4")],
+            [tmp_path / "a_out.mp4", tmp_path / "b_out.mp4"],
+            ["-c:a", "copy"]
+        )
+        assert cmd.count("-i") == 2
+        assert cmd[cmd.index("-filter_complex") + 1] == (
+            "[0:v]ass=/dev/fd/3[v0];[1:v]ass=/dev/fd/4[v1]"
+        )
+        assert cmd.index("[v1]") < cmd.index(str(tmp_path / "b_out.mp4"))
+        assert cmd[cmd.index("[v1]") + 2] == "1:a?"
+        assert cmd[-1] == str(tmp_path / "b_out.mp4")
+
+    def test_batch_command_shares_vaapi_device(self, tmp_path):
+        """Test that VAAPI batches open the device once for all inputs."""
+        cmd = ffmpeg._build_batch_cmd(
+            "vaapi",
+            [(tmp_path / "a.mp4", "/dev/fd/3"), (tmp_path / "b.mp4", "/dev/fd/4")],
+            [tmp_path / "a_out.mp4", tmp_path / "b_out.mp4"],
+            ["-c:a", "copy"]
+        )
+        assert cmd.count("-vaapi_device") == 1
+        assert cmd.index("-vaapi_device") < cmd.index("-i")
+
+    def test_encoder_chain_falls_back_to_libx264(self, monkeypatch):
+        """Test that libx264 always ends the encoder chain."""
+        monkeypatch.setattr(ffmpeg, "get_available_encoders", frozenset)
+        monkeypatch.setattr(settings, "encoder", "nvenc")
+        assert ffmpeg._encoder_chain() == ["nvenc", "libx264"]
+
+        monkeypatch.setattr(settings, "encoder", "vaapi")
+        assert ffmpeg._encoder_chain() == ["vaapi", "libx264"]
+
+        monkeypatch.setattr(settings, "encoder", "auto")
+        assert ffmpeg._encoder_chain() == ["libx264"]
+
+        monkeypatch.setattr(settings, "encoder", "libx264")
+        assert ffmpeg._encoder_chain() == ["libx264"]
+
+    def test_unknown_encoder_rejected(self):
+        """Test that a misspelled encoder fails at startup, not as auto."""
+        with pytest.raises(ValidationError):
+            Settings(encoder="cuda")
+
+    def test_unknown_x264_preset_rejected(self):
+        """Test that an invalid libx264 preset fails at startup."""
+        with pytest.raises(ValidationError):
+            Settings(x264_preset="turbo")
+
+
+class TestRenderBatch:
+    """Tests for rendering several videos in one FFmpeg process."""
+
+    @pytest.mark.asyncio
+    async def test_batch_reads_each_subtitle_file(self, fake_ffmpeg, tmp_path):
+        """Test that every job's ASS content reaches the single process."""
+        outputs = await ffmpeg.render_batch([
+            (tmp_path / "a.mp4", b"first"),
+            (tmp_path / "b.mp4", b"second")
+        ])
+
+        assert [p.read_bytes() for p in outputs] == [b"rendered", b"rendered"]
+        assert fake_ffmpeg() == [{"codec": "libx264", "ass": ["first", "second"]}]
+
+    @pytest.mark.asyncio
+    async def test_batch_falls_back_to_next_encoder(
+        self, fake_ffmpeg, monkeypatch, tmp_path
+    ):
+        """Test that a failed hardware encode is retried with libx264."""
+        monkeypatch.setattr(ffmpeg, "_encoder_chain", lambda: ["nvenc", "libx264"])
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "h264_nvenc")
+
+        outputs = await ffmpeg.render_batch([(tmp_path / "a.mp4", b"first")])
+
+        assert all(p.exists() for p in outputs)
+        assert [call["codec"] for call in fake_ffmpeg()] == ["h264_nvenc", "libx264"]
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_cleans_up(self, fake_ffmpeg, monkeypatch, tmp_path):
+        """Test that partial outputs are removed when every encoder fails."""
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "libx264")
+
+        with pytest.raises(ffmpeg.RenderError):
+            await ffmpeg.render_batch([
+                (tmp_path / "a.mp4", b"first"),
+                (tmp_path / "b.mp4", b"second")
+            ])
+
+        assert list((tmp_path / "work").iterdir()) == []
+
+
+class TestExtractAndRender:
+    """Tests for extracting audio and rendering in one FFmpeg process."""
+
+    @pytest.mark.asyncio
+    async def test_writes_audio_and_video(self, fake_ffmpeg, monkeypatch, tmp_path):
+        """Test that both outputs are written, falling back to libx264."""
+        async def fake_probe(path):
+            return {"streams": [{"codec_type": "video"}, {"codec_type": "audio"}]}
+
+        monkeypatch.setattr(ffmpeg, "probe_video", fake_probe)
+        monkeypatch.setattr(ffmpeg, "_encoder_chain", lambda: ["nvenc", "libx264"])
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "h264_nvenc")
+
+        audio_path, output_path = await ffmpeg.extract_and_render(
+            tmp_path / "in.mp4", b"subs"
+        )
+
+        assert audio_path == tmp_path / "in.wav"
+        assert audio_path.exists() and output_path.exists()
+        assert fake_ffmpeg() == [
+            {"codec": "h264_nvenc", "ass": ["subs"]},
+            {"codec": "libx264", "ass": ["subs"]}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_rejects_video_without_audio(self, fake_ffmpeg, monkeypatch, tmp_path):
+        """Test that a silent video fails before FFmpeg is started."""
+        async def fake_probe(path):
+            return {"streams": [{"codec_type": "video"}]}
+
+        monkeypatch.setattr(ffmpeg, "probe_video", fake_probe)
+
+        with pytest.raises(ffmpeg.RenderError, match="no audio track"):
+            await ffmpeg.extract_and_render(tmp_path / "in.mp4", b"subs")
+        assert fake_ffmpeg() == []
+
+    @pytest.mark.asyncio
+    async def test_failure_cleans_up(self, fake_ffmpeg, monkeypatch, tmp_path):
+        """Test that partial audio and video outputs are removed on failure."""
+        async def fake_probe(path):
+            return {"streams": [{"codec_type": "video"}, {"codec_type": "audio"}]}
+
+        monkeypatch.setattr(ffmpeg, "probe_video", fake_probe)
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "libx264")
+
+        with pytest.raises(ffmpeg.RenderError):
+            await ffmpeg.extract_and_render(tmp_path / "in.mp4", b"subs")
+
+        assert not (tmp_path / "in.wav").exists()
+        assert list((tmp_path / "work").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_render_subtitles_failure_cleans_up(
+        self, fake_ffmpeg, monkeypatch, tmp_path
+    ):
+        """Test that render_subtitles removes an output it named itself."""
+        monkeypatch.setenv("FAKE_FFMPEG_FAIL", "libx264")
+
+        with pytest.raises(ffmpeg.RenderError):
+            await ffmpeg.render_subtitles(tmp_path / "in.mp4", b"subs")
+
+        assert list((tmp_path / "work").iterdir()) == []
+
 
 class TestRenderEndpoint:
     """Tests for the /render endpoint."""
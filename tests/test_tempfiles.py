@@ -0,0 +1,21 @@
+"""Tests for the shared temp file helpers."""
+
+from app.config import get_settings
+from app.tempfiles import ensure_temp_dir, tmp_name
+
+
+class TestTempDir:
+    """Tests for temp directory creation."""
+
+    def test_overridden_temp_dir_is_created(self, monkeypatch, tmp_path):
+        """Test that a changed temp_dir is created even after first use."""
+        monkeypatch.setattr(get_settings(), "temp_dir", tmp_path / "first")
+        assert ensure_temp_dir().is_dir()
+
+        monkeypatch.setattr(get_settings(), "temp_dir", tmp_path / "second")
+        assert ensure_temp_dir() == tmp_path / "second"
+        assert (tmp_path / "second").is_dir()
+
+    def test_tmp_names_are_unique(self):
+        """Test that names from the shared counter never repeat."""
+        assert tmp_name(".mp4") != tmp_name(".mp4")
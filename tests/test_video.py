@@ -0,0 +1,154 @@
+"""Tests for the video download and probing service."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.config import get_settings
+from app.services import video
+from app.services.video import (
+    download_video,
+    download_videos,
+    extract_audio,
+    get_video_duration,
+    get_video_resolution,
+    VideoError
+)
+
+FAKE_FFPROBE = """#!/bin/sh
+echo call >> "$(dirname "$0")/calls.log"
+cat <<'JSON'
+{"streams": [{"codec_type": "audio"},
+             {"codec_type": "video", "width": 1080, "height": 1920}],
+ "format": {"duration": "12.500000"}}
+JSON
+"""
+
+# Stand-in for a long audio extraction: creates the output file, marks
+# itself as started and keeps running until it is killed
+SLOW_FFMPEG = """#!/bin/sh
+for last; do :; done
+: > "$last"
+touch "$(dirname "$0")/started"
+exec sleep 30
+"""
+
+
+@pytest.fixture
+def mock_client(monkeypatch, tmp_path):
+    """Route downloads through a mock transport into a temp directory."""
+
+    async def stalled_body():
+        yield b"partial"
+        await asyncio.Event().wait()  # Never completes
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/missing.mp4":
+            return httpx.Response(404)
+        if request.url.path == "/stalled.mp4":
+            return httpx.Response(200, content=stalled_body())
+        return httpx.Response(200, content=request.url.path.encode() * 1000)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(video, "_client", client)
+    monkeypatch.setattr(video, "_download_semaphore", None)
+    monkeypatch.setattr(get_settings(), "temp_dir", tmp_path)
+    return client
+
+
+class TestDownload:
+    """Tests for streaming video downloads."""
+
+    @pytest.mark.asyncio
+    async def test_download_video(self, mock_client):
+        """Test that a single download is streamed to disk."""
+        path = await download_video("https://example.com/a.mp4")
+        assert path.read_bytes() == b"/a.mp4" * 1000
+
+    @pytest.mark.asyncio
+    async def test_download_videos_preserves_order(self, mock_client):
+        """Test that concurrent downloads return paths in input order."""
+        paths = await download_videos([
+            "https://example.com/a.mp4",
+            "https://example.com/b.mp4"
+        ])
+        assert [p.read_bytes()[:6] for p in paths] == [b"/a.mp4", b"/b.mp4"]
+
+    @pytest.mark.asyncio
+    async def test_failed_download_cleans_up(self, mock_client, tmp_path):
+        """Test that one failure raises and removes the other files."""
+        with pytest.raises(VideoError):
+            await download_videos([
+                "https://example.com/a.mp4",
+                "https://example.com/missing.mp4"
+            ])
+        assert list(tmp_path.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_download_cleans_up(self, mock_client, tmp_path):
+        """Test that cancelling mid-stream removes the partial file."""
+        task = asyncio.create_task(download_video("https://example.com/stalled.mp4"))
+        while not list(tmp_path.iterdir()):
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert list(tmp_path.iterdir()) == []
+
+
+@pytest.fixture
+def fake_ffprobe(fake_binary, monkeypatch):
+    """Put a fake ffprobe on PATH that prints canned JSON."""
+    bin_dir = fake_binary("ffprobe", FAKE_FFPROBE)
+    monkeypatch.setattr(video, "_probe_cache", video.OrderedDict())
+    monkeypatch.setattr(video, "_probe_semaphore", None)
+    return bin_dir / "calls.log"
+
+
+class TestProbe:
+    """Tests for ffprobe metadata parsing."""
+
+    @pytest.mark.asyncio
+    async def test_duration_and_resolution(self, fake_ffprobe, tmp_path):
+        """Test that both values come from a single cached probe."""
+        video_path = tmp_path / "in.mp4"
+        video_path.write_bytes(b"")
+
+        assert await get_video_duration(video_path) == 12.5
+        assert await get_video_resolution(video_path) == (1080, 1920)
+        assert fake_ffprobe.read_text().count("call") == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_file(self, fake_ffprobe, tmp_path):
+        """Test that probing a missing file raises VideoError."""
+        with pytest.raises(VideoError):
+            await get_video_duration(tmp_path / "missing.mp4")
+
+
+class TestExtractAudio:
+    """Tests for audio extraction."""
+
+    @pytest.mark.asyncio
+    async def test_cancel_after_ffmpeg_exited(self, fake_binary, monkeypatch, tmp_path):
+        """Test that cancellation survives kill() racing with FFmpeg's exit."""
+        started = fake_binary("ffmpeg", SLOW_FFMPEG) / "started"
+        real_kill = asyncio.subprocess.Process.kill
+
+        def kill_after_exit(process):
+            # Reap the fake, then report it as already gone
+            real_kill(process)
+            raise ProcessLookupError
+
+        monkeypatch.setattr(asyncio.subprocess.Process, "kill", kill_after_exit)
+
+        video_path = tmp_path / "in.mp4"
+        task = asyncio.create_task(extract_audio(video_path))
+        while not started.exists():
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert not video_path.with_suffix(".wav").exists()